@@ -3,7 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from ... import schemas
-from ...security import create_token, hash_password, require_token, verify_password
+from ...security import create_token, forget_user, hash_password, needs_rehash, require_token, verify_password
 
 router = APIRouter()
 
@@ -15,6 +15,8 @@ def login(payload: schemas.LoginRequest, request: Request) -> schemas.LoginRespo
   user = db.get_user(payload.username)
   if not user or not verify_password(payload.password, user["password_hash"], settings):
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+  if needs_rehash(user["password_hash"]):
+    db.update_user(user["username"], hash_password(payload.password), user["id"])
   token = create_token(payload.username, settings)
   db.store_token(user["id"], token)
   return schemas.LoginResponse(token=token, expires_in=settings.app_token_expire_seconds, username=payload.username)
@@ -39,8 +41,10 @@ def update_profile(payload: schemas.ProfileUpdateRequest, request: Request, curr
   if payload.newUsername and payload.newUsername != current_user:
     if db.get_user(target_username):
       raise HTTPException(status_code=400, detail="Username already in use.")
-  new_hash = hash_password(payload.newPassword, settings) if payload.newPassword else user["password_hash"]
+  new_hash = hash_password(payload.newPassword) if payload.newPassword else user["password_hash"]
   db.update_user(target_username, new_hash, user["id"])
+  if target_username != current_user:
+    forget_user(current_user)
 
   new_token = create_token(target_username, settings)
   db.store_token(user["id"], new_token)
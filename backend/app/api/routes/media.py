@@ -1,20 +1,58 @@
-"""Media endpoints for snapshots and latest frame."""
+"""Media endpoints for snapshots, latest frame, and the live MJPEG stream."""
 
-import io
+import asyncio
+from typing import AsyncIterator
 
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from ...services.camera import CameraMonitor
 
 router = APIRouter()
 
+_MJPEG_BOUNDARY = "frame"
+
+
+async def _mjpeg_parts(camera_monitor: CameraMonitor, interval: float) -> AsyncIterator[bytes]:
+  """Yield each new camera frame once as a multipart/x-mixed-replace part, until the monitor stops."""
+  last_timestamp = None
+  while camera_monitor.is_running:
+    frame_timestamp = camera_monitor.latest_frame_timestamp()
+    if frame_timestamp != last_timestamp:
+      # May JPEG-encode the frame, so keep it off the event loop.
+      frame = await asyncio.to_thread(camera_monitor.latest_frame_bytes)
+      if frame:
+        last_timestamp = frame_timestamp
+        yield (
+          f"--{_MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(frame)}\r\n\r\n".encode()
+          + frame
+          + b"\r\n"
+        )
+    await asyncio.sleep(interval)
+
 
 @router.get("/latest-frame")
-def get_latest_frame(request: Request) -> StreamingResponse:
+def get_latest_frame(request: Request) -> Response:
   camera_monitor = request.app.state.camera_monitor
   frame = camera_monitor.latest_frame_bytes() if camera_monitor else None
   if not frame:
     raise HTTPException(status_code=404, detail="No frame captured yet.")
-  return StreamingResponse(io.BytesIO(frame), media_type="image/jpeg")
+  # A plain Response sends Content-Length with the body instead of chunked encoding.
+  return Response(content=frame, media_type="image/jpeg", headers={"Cache-Control": "no-store"})
+
+
+@router.get("/stream.mjpg")
+def stream_latest_frames(request: Request) -> StreamingResponse:
+  """Push frames over one long-lived response instead of one request per snapshot."""
+  camera_monitor = request.app.state.camera_monitor
+  if not camera_monitor or not camera_monitor.is_running:
+    raise HTTPException(status_code=404, detail="Camera monitor is not running.")
+  interval = max(request.app.state.settings.cam_frame_interval, 0.05)
+  return StreamingResponse(
+    _mjpeg_parts(camera_monitor, interval),
+    media_type=f"multipart/x-mixed-replace; boundary={_MJPEG_BOUNDARY}",
+    headers={"Cache-Control": "no-store"},
+  )
 
 
 @router.get("/event-snapshot/{event_id}")
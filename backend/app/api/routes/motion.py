@@ -1,6 +1,7 @@
-"""Motion event routes."""
+"""Motion event routes (sync handlers so SQLite work runs in the thread pool)."""
 
-from fastapi import APIRouter, Depends, Request
+from anyio import from_thread
+from fastapi import APIRouter, Depends, Request, Response
 
 from ... import schemas
 from ...security import require_token
@@ -9,14 +10,18 @@ router = APIRouter()
 
 
 @router.get("/motion-events", response_model=schemas.MotionEventsResponse)
-async def get_motion_events(request: Request, _: str = Depends(require_token)) -> schemas.MotionEventsResponse:
-  events = request.app.state.event_service.fetch_motion_events()
-  return schemas.MotionEventsResponse(events=events)
+def get_motion_events(request: Request, _: str = Depends(require_token)) -> Response:
+  etag, body = request.app.state.event_service.motion_events_response()
+  # no-cache lets browsers keep the body but revalidate it with If-None-Match every poll.
+  headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+  if request.headers.get("if-none-match") == etag:
+    return Response(status_code=304, headers=headers)
+  return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.post("/motion-events/simulate")
-async def simulate_motion_event(request: Request, _: str = Depends(require_token)) -> dict:
+def simulate_motion_event(request: Request, _: str = Depends(require_token)) -> dict:
   event_service = request.app.state.event_service
-  event = event_service.create_motion_event()
-  await event_service.persist_event(event)
+  event = event_service.store_event(event_service.create_motion_event())
+  from_thread.run(event_service.publish_event, event)
   return event
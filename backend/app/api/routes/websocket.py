@@ -1,42 +1,57 @@
 """WebSocket endpoint for live motion events."""
 
-import asyncio
+from typing import Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+import orjson
+from fastapi import APIRouter, HTTPException, WebSocket, status
 
-from ...security import decode_token
+from ...security import decode_token, user_exists_async
 
 router = APIRouter()
 
+_AUTH_SUBPROTOCOL = "bearer"
+_CONNECTED_MESSAGE = orjson.dumps({"type": "info", "message": "Connected to motion event stream"}).decode()
+
+
+def _extract_token(websocket: WebSocket) -> Tuple[Optional[str], Optional[str]]:
+  """Return (token, subprotocol to accept), preferring the Sec-WebSocket-Protocol header.
+
+  Browsers can send ``new WebSocket(url, ["bearer", token])`` which keeps the token
+  out of URLs and access logs; the ``?token=`` query parameter is still accepted.
+  """
+  protocols = [chunk.strip() for chunk in websocket.headers.get("sec-websocket-protocol", "").split(",")]
+  if len(protocols) == 2 and protocols[0] == _AUTH_SUBPROTOCOL and protocols[1]:
+    return protocols[1], _AUTH_SUBPROTOCOL
+  return websocket.query_params.get("token"), None
+
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket, request: Request) -> None:
-  settings = request.app.state.settings
-  db = request.app.state.db
-  manager = request.app.state.ws_manager
+async def websocket_endpoint(websocket: WebSocket) -> None:
+  settings = websocket.app.state.settings
+  db = websocket.app.state.db
+  manager = websocket.app.state.ws_manager
 
-  token = websocket.query_params.get("token")
+  token, subprotocol = _extract_token(websocket)
   if not token:
     await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
     return
   try:
     payload = decode_token(token, settings)
     username = payload.get("sub")
-    if not username or not db.get_user(username):
+    if not username or not await user_exists_async(username, db):
       raise HTTPException(status_code=401, detail="Invalid token")
   except HTTPException:
     await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
     return
 
-  await manager.connect(websocket)
+  await manager.connect(websocket, subprotocol=subprotocol)
   try:
-    await websocket.send_json({"type": "info", "message": "Connected to motion event stream"})
-    while True:
-      await websocket.receive_text()
-  except WebSocketDisconnect:
-    manager.disconnect(websocket)
-  except asyncio.CancelledError:
-    manager.disconnect(websocket)
-    raise
+    await websocket.send_text(_CONNECTED_MESSAGE)
+    # Inbound frames are never used, so wait on raw ASGI messages for the
+    # disconnect instead of decoding every client frame as text.
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+      pass
   except Exception:
+    pass
+  finally:
     manager.disconnect(websocket)
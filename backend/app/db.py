@@ -4,42 +4,111 @@ import os
 import sqlite3
 import threading
 from contextlib import contextmanager
-from typing import Iterator, Optional
+from typing import Callable, Iterator, List, Optional, Set
 
 from .settings import Settings
 
+# Per-connection tuning; journal_mode is persisted in the database file itself.
+_CONNECTION_PRAGMAS = (
+  "PRAGMA synchronous=NORMAL",
+  "PRAGMA cache_size=-64000",
+  "PRAGMA temp_store=MEMORY",
+  "PRAGMA mmap_size=268435456",
+)
+
+# Hot statements kept as constants so every call hits sqlite3's statement cache.
+_SELECT_USER_SQL = "SELECT * FROM users WHERE username = ?"
+_UPDATE_USER_SQL = "UPDATE users SET username = ?, password_hash = ? WHERE id = ?"
+_UPDATE_TOKEN_SQL = "UPDATE users SET last_token = ? WHERE id = ?"
+_STATEMENT_CACHE_SIZE = 256
+
+
+# Directories already created by this process, so repeat calls skip the stat().
+_known_dirs: Set[str] = set()
+_known_dirs_lock = threading.Lock()
+
 
 def ensure_parent_dir(path: str) -> None:
   directory = os.path.dirname(path)
-  if directory and not os.path.exists(directory):
+  if not directory:
+    return
+  with _known_dirs_lock:
+    if directory in _known_dirs:
+      return
     os.makedirs(directory, exist_ok=True)
+    _known_dirs.add(directory)
 
 
 class Database:
-  """Simple SQLite helper that serializes writes with a lock."""
+  """SQLite helper with one shared writer connection and a reader per thread.
+
+  Connections stay open for the life of the process; writes are serialized
+  with a lock and the database runs in WAL mode so readers never block them.
+  """
 
   def __init__(self, settings: Settings):
     self.settings = settings
     self._lock = threading.Lock()
     ensure_parent_dir(self.settings.app_db_path)
     ensure_parent_dir(self.settings.snapshot_dir + "/placeholder")
+    self._local = threading.local()
+    self._readers: List[sqlite3.Connection] = []
+    self._readers_lock = threading.Lock()
+    self._writer = self._open()
+    self._writer.execute("PRAGMA journal_mode=WAL")
+
+  def _open(self) -> sqlite3.Connection:
+    conn = sqlite3.connect(self.settings.app_db_path, check_same_thread=False, cached_statements=_STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row
+    for pragma in _CONNECTION_PRAGMAS:
+      conn.execute(pragma)
+    return conn
+
+  def get_reader(self) -> sqlite3.Connection:
+    """Return this thread's read connection, opening it on first use."""
+    conn = getattr(self._local, "reader", None)
+    if conn is None:
+      conn = self._open()
+      # Readers never write; query_only turns an accidental write into an error
+      # instead of a second writer contending for the WAL lock.
+      conn.execute("PRAGMA query_only=ON")
+      self._local.reader = conn
+      with self._readers_lock:
+        self._readers.append(conn)
+    return conn
 
   @contextmanager
   def connect(self) -> Iterator[sqlite3.Connection]:
-    conn = sqlite3.connect(self.settings.app_db_path, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    try:
-      yield conn
-    finally:
-      conn.close()
+    """Yield the writer inside write_lock(), otherwise this thread's reader."""
+    if getattr(self._local, "writing", False):
+      yield self._writer
+    else:
+      yield self.get_reader()
 
   @contextmanager
   def write_lock(self) -> Iterator[None]:
     with self._lock:
-      yield
+      self._local.writing = True
+      try:
+        yield
+      except BaseException:
+        if self._writer.in_transaction:
+          self._writer.rollback()
+        raise
+      finally:
+        self._local.writing = False
+
+  def close(self) -> None:
+    """Close every pooled connection; call once on shutdown."""
+    with self._readers_lock:
+      readers, self._readers = self._readers, []
+    for conn in readers:
+      conn.close()
+    with self._lock:
+      self._writer.close()
 
-  def init_db(self, *, default_username: str, default_password_hash: str) -> None:
-    """Create tables and seed the default user."""
+  def init_db(self, *, default_username: str, hash_default_password: Callable[[], str]) -> None:
+    """Create tables and seed the default user, hashing its password only when seeding."""
     with self.write_lock():
       with self.connect() as conn:
         conn.execute(
@@ -76,29 +145,31 @@ class Database:
           conn.execute("ALTER TABLE motion_events ADD COLUMN detections TEXT")
         if "snapshot_path" not in columns:
           conn.execute("ALTER TABLE motion_events ADD COLUMN snapshot_path TEXT")
+        # ISO-8601 timestamps sort lexicographically, so retention pruning can range-scan this.
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_motion_events_timestamp ON motion_events(timestamp)")
         conn.commit()
 
         cursor = conn.execute("SELECT id FROM users WHERE username = ?", (default_username,))
         if cursor.fetchone() is None:
           conn.execute(
             "INSERT INTO users (username, password_hash) VALUES (?, ?)",
-            (default_username, default_password_hash),
+            (default_username, hash_default_password()),
           )
           conn.commit()
 
   def get_user(self, username: str) -> Optional[sqlite3.Row]:
     with self.connect() as conn:
-      cursor = conn.execute("SELECT * FROM users WHERE username = ?", (username,))
+      cursor = conn.execute(_SELECT_USER_SQL, (username,))
       return cursor.fetchone()
 
   def update_user(self, username: str, password_hash: str, user_id: int) -> None:
     with self.write_lock():
       with self.connect() as conn:
-        conn.execute("UPDATE users SET username = ?, password_hash = ? WHERE id = ?", (username, password_hash, user_id))
+        conn.execute(_UPDATE_USER_SQL, (username, password_hash, user_id))
         conn.commit()
 
   def store_token(self, user_id: int, token: str) -> None:
     with self.write_lock():
       with self.connect() as conn:
-        conn.execute("UPDATE users SET last_token = ? WHERE id = ?", (token, user_id))
+        conn.execute(_UPDATE_TOKEN_SQL, (token, user_id))
         conn.commit()
@@ -1,10 +1,17 @@
 """Authentication and authorization helpers."""
 
+import asyncio
+import base64
 import hashlib
-from datetime import datetime, timedelta, timezone
+import hmac
+import os
+import threading
+import time
 from typing import Dict
 
 import jwt
+import orjson
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
@@ -13,29 +20,110 @@ from .settings import Settings
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
+_SCRYPT_PREFIX = "scrypt"
+_SCRYPT_PARAMS = {"n": 2**14, "r": 8, "p": 1, "dklen": 32}
 
-def hash_password(password: str, settings: Settings) -> str:
+# Verified token payloads keyed by a token digest; entries are also checked
+# against the token's own exp so a cached payload never outlives the token.
+_payload_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+_payload_cache_lock = threading.Lock()
+
+# Usernames confirmed to exist, so require_token skips the SQLite lookup.
+_user_cache: TTLCache = TTLCache(maxsize=1000, ttl=60)
+_user_cache_lock = threading.Lock()
+
+
+def _legacy_hash(password: str, settings: Settings) -> str:
   return hashlib.sha256(f"{password}{settings.app_password_salt}".encode()).hexdigest()
 
 
+def _scrypt(password: str, salt: bytes) -> bytes:
+  return hashlib.scrypt(password.encode(), salt=salt, **_SCRYPT_PARAMS)
+
+
+def hash_password(password: str) -> str:
+  """Hash a password with scrypt and a random per-user salt."""
+  salt = os.urandom(16)
+  return f"{_SCRYPT_PREFIX}${salt.hex()}${_scrypt(password, salt).hex()}"
+
+
 def verify_password(password: str, password_hash: str, settings: Settings) -> bool:
-  return hash_password(password, settings) == password_hash
+  """Check a password against a scrypt hash or a legacy salted SHA-256 hash."""
+  if password_hash.startswith(f"{_SCRYPT_PREFIX}$"):
+    try:
+      _, salt_hex, digest_hex = password_hash.split("$")
+      salt, digest = bytes.fromhex(salt_hex), bytes.fromhex(digest_hex)
+    except ValueError:
+      return False
+    return hmac.compare_digest(_scrypt(password, salt), digest)
+  return hmac.compare_digest(_legacy_hash(password, settings), password_hash)
+
+
+def needs_rehash(password_hash: str) -> bool:
+  """Return True for hashes stored with the legacy SHA-256 scheme."""
+  return not password_hash.startswith(f"{_SCRYPT_PREFIX}$")
+
+
+def _b64url(data: bytes) -> bytes:
+  return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# The HS256 header never changes, so it is serialized and encoded once.
+_HS256_HEADER_B64 = _b64url(b'{"alg":"HS256","typ":"JWT"}')
 
 
 def create_token(username: str, settings: Settings) -> str:
-  payload = {
-    "sub": username,
-    "exp": datetime.now(tz=timezone.utc) + timedelta(seconds=settings.app_token_expire_seconds),
-  }
-  return jwt.encode(payload, settings.app_jwt_secret, algorithm=settings.app_jwt_algorithm)
+  payload = {"sub": username, "exp": int(time.time()) + settings.app_token_expire_seconds}
+  if settings.app_jwt_algorithm != "HS256":
+    return jwt.encode(payload, settings.app_jwt_secret, algorithm=settings.app_jwt_algorithm)
+
+  signing_input = _HS256_HEADER_B64 + b"." + _b64url(orjson.dumps(payload))
+  signature = hmac.new(settings.app_jwt_secret.encode(), signing_input, hashlib.sha256).digest()
+  return (signing_input + b"." + _b64url(signature)).decode()
 
 
 def decode_token(token: str, settings: Settings) -> Dict:
+  key = hashlib.sha256(token.encode()).digest()[:16]
+  with _payload_cache_lock:
+    cached = _payload_cache.get(key)
+  if cached is not None and cached.get("exp", 0) > time.time():
+    return cached
+
   try:
-    return jwt.decode(token, settings.app_jwt_secret, algorithms=[settings.app_jwt_algorithm])
+    payload = jwt.decode(token, settings.app_jwt_secret, algorithms=[settings.app_jwt_algorithm])
   except jwt.PyJWTError as exc:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token") from exc
 
+  with _payload_cache_lock:
+    _payload_cache[key] = payload
+  return payload
+
+
+def user_exists(username: str, db: Database) -> bool:
+  """Check that a user exists, remembering positive answers for a short while."""
+  with _user_cache_lock:
+    if username in _user_cache:
+      return True
+  if not db.get_user(username):
+    return False
+  with _user_cache_lock:
+    _user_cache[username] = True
+  return True
+
+
+async def user_exists_async(username: str, db: Database) -> bool:
+  """Like user_exists, but runs the SQLite lookup off the event loop on a cache miss."""
+  with _user_cache_lock:
+    if username in _user_cache:
+      return True
+  return await asyncio.to_thread(user_exists, username, db)
+
+
+def forget_user(username: str) -> None:
+  """Drop a username from the existence cache after it is renamed."""
+  with _user_cache_lock:
+    _user_cache.pop(username, None)
+
 
 async def require_token(
   request: Request,
@@ -52,7 +140,6 @@ async def require_token(
   if not username:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-  user = db.get_user(username)
-  if not user:
+  if not await user_exists_async(username, db):
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
   return username
@@ -2,32 +2,109 @@
 
 import asyncio
 import logging
+import sys
 import threading
 import time
-from datetime import datetime, timezone
-from typing import Optional
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
 
 import cv2
+import numpy as np
 
 from ..settings import Settings
 from .detection import ObjectDetector
-from .events import EventService
+from .events import EventService, utc_now_iso
+
+try:
+  import simplejpeg
+except ImportError:
+  simplejpeg = None  # type: ignore
 
 logger = logging.getLogger("home_ai_motion.camera")
 
 
-def _preprocess_frame(frame):
-  gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-  gray = cv2.GaussianBlur(gray, (21, 21), 0)
-  return gray
+# Motion is detected on a copy of each frame this many pixels wide, keeping
+# the camera's aspect ratio (320x240 for 4:3, 320x180 for 16:9). CAM_MIN_AREA
+# is rescaled from the capture resolution to that size.
+_MOTION_WIDTH = 320
+# Resolution requested from the driver; most webcams default to far more.
+_CAPTURE_SIZE = (640, 480)
+# Lowest frame rate requested from the driver. The capture thread keeps grabbing
+# and drops frames the processor skips, so the driver must run well above the
+# processing rate for a fresh frame to be ready whenever one is wanted.
+_MIN_CAPTURE_FPS = 15
+
+
+def _motion_size(frame) -> Tuple[int, int]:
+  height, width = frame.shape[:2]
+  return _MOTION_WIDTH, max(1, round(_MOTION_WIDTH * height / width))
+
+
+def _preprocess_frame(frame, size: Tuple[int, int]):
+  small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+  return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
 
 
-def _frame_has_motion(baseline, current, threshold: float, min_area: int) -> bool:
-  frame_delta = cv2.absdiff(baseline, current)
-  thresh = cv2.threshold(frame_delta, threshold, 255, cv2.THRESH_BINARY)[1]
-  thresh = cv2.dilate(thresh, None, iterations=2)
-  contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-  return any(cv2.contourArea(contour) > min_area for contour in contours)
+def _preferred_capture_api() -> int:
+  """Native capture backend for this platform instead of OpenCV's auto-detection."""
+  if sys.platform.startswith("linux"):
+    return cv2.CAP_V4L2
+  if sys.platform == "win32":
+    return cv2.CAP_MSMF
+  if sys.platform == "darwin":
+    return cv2.CAP_AVFOUNDATION
+  return cv2.CAP_ANY
+
+
+def _open_capture(settings: Settings):
+  cap = cv2.VideoCapture(settings.camera_index, _preferred_capture_api())
+  if not cap.isOpened():
+    cap.release()
+    cap = cv2.VideoCapture(settings.camera_index)
+  if not cap.isOpened():
+    return cap
+  # MJPG keeps USB bandwidth down and a one-frame driver buffer avoids reading stale frames.
+  cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+  cap.set(cv2.CAP_PROP_FRAME_WIDTH, _CAPTURE_SIZE[0])
+  cap.set(cv2.CAP_PROP_FRAME_HEIGHT, _CAPTURE_SIZE[1])
+  cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+  cap.set(cv2.CAP_PROP_FPS, max(_MIN_CAPTURE_FPS, round(1 / max(settings.cam_frame_interval, 1 / 30))))
+  if cap.getBackendName() == "V4L2" and int(cap.get(cv2.CAP_PROP_FOURCC)) == cv2.VideoWriter_fourcc(*"MJPG"):
+    # V4L2 can hand over the camera's own JPEG instead of a decoded frame,
+    # which the snapshot path then serves without re-encoding.
+    cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+  return cap
+
+
+def _is_encoded_jpeg(frame) -> bool:
+  """True when retrieve() returned the driver's compressed buffer rather than pixels."""
+  return frame.ndim < 3 and min(frame.shape) == 1 and frame.size > 2 and frame.flat[0] == 0xFF and frame.flat[1] == 0xD8
+
+
+def _create_background_model(settings: Settings):
+  return cv2.createBackgroundSubtractorMOG2(
+    history=max(settings.cam_baseline_refresh_frames, 1),
+    varThreshold=settings.cam_motion_threshold,
+    detectShadows=False,
+  )
+
+
+def _frame_has_motion(background, current, min_area: float) -> bool:
+  mask = background.apply(current)
+  # No single region can be larger than all foreground pixels combined.
+  if cv2.countNonZero(mask) <= min_area:
+    return False
+  # Require one connected region above min_area so scattered sensor noise does not add up to motion.
+  _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+  return bool((stats[1:, cv2.CC_STAT_AREA] > min_area).any())
+
+
+def _log_persist_failure(future: Future) -> None:
+  if future.cancelled():
+    return
+  exc = future.exception()
+  if exc is not None:
+    logger.error("Failed to record webcam motion event: %s", exc, exc_info=exc)
 
 
 class CameraMonitor:
@@ -40,8 +117,21 @@ class CameraMonitor:
     self._stop = threading.Event()
     self._thread: Optional[threading.Thread] = None
     self._event_loop: Optional[asyncio.AbstractEventLoop] = None
-    self._latest_frame_lock = threading.Lock()
-    self._latest_frame_bytes: Optional[bytes] = None
+    # Newest (frame, timestamp) and the JPEG of whichever frame was last
+    # encoded; frames are only encoded when a client or an event needs them.
+    # Both are immutable tuples swapped by a single attribute assignment, which
+    # is atomic under the GIL, so readers need no lock; a reader that sees a
+    # mismatched pair just encodes the frame itself.
+    self._latest_frame: Optional[Tuple[Any, str]] = None
+    self._encoded_frame: Optional[Tuple[str, bytes]] = None
+    self._jpeg_params = [cv2.IMWRITE_JPEG_QUALITY, settings.cam_jpeg_quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+    # Single-slot handoff between the capture and processing threads. The
+    # processor raises _frame_wanted and the capture thread decodes the next
+    # grabbed frame for it; every other grab is discarded undecoded.
+    self._raw_frame_lock = threading.Lock()
+    self._raw_frame_ready = threading.Event()
+    self._frame_wanted = threading.Event()
+    self._latest_raw: Optional[Tuple[Any, str]] = None
 
   def start(self, loop: asyncio.AbstractEventLoop) -> None:
     if self._thread:
@@ -57,82 +147,163 @@ class CameraMonitor:
     if self._thread:
       self._thread.join(timeout=5)
 
+  @property
+  def is_running(self) -> bool:
+    """True while the monitor thread is alive and has not been asked to stop."""
+    return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+  def latest_frame_timestamp(self) -> Optional[str]:
+    latest = self._latest_frame
+    return latest[1] if latest else None
+
   def latest_frame_bytes(self) -> Optional[bytes]:
-    with self._latest_frame_lock:
-      return self._latest_frame_bytes
+    """JPEG of the newest frame, encoded on first request and reused until the next frame."""
+    latest, encoded = self._latest_frame, self._encoded_frame
+    if latest is None:
+      return None
+    frame, frame_timestamp = latest
+    if encoded and encoded[0] == frame_timestamp:
+      return encoded[1]
+    return self._encode_frame(frame, frame_timestamp)
+
+  def _encode_frame(self, frame, frame_timestamp: str) -> Optional[bytes]:
+    try:
+      if simplejpeg is not None:
+        # libjpeg-turbo straight from the numpy buffer; noticeably faster than imencode.
+        encoded = simplejpeg.encode_jpeg(
+          np.ascontiguousarray(frame), quality=self.settings.cam_jpeg_quality, colorspace="BGR", fastdct=True
+        )
+      else:
+        success, buffer = cv2.imencode(".jpg", frame, self._jpeg_params)
+        if not success:
+          return None
+        encoded = buffer.tobytes()
+    except Exception as exc:
+      logger.debug("Failed to encode frame for snapshot: %s", exc)
+      return None
+    # A slow reader may finish after a newer frame (and possibly its passthrough
+    # JPEG) was published; only cache the result while it is still the latest.
+    latest = self._latest_frame
+    if latest is not None and latest[1] == frame_timestamp:
+      self._encoded_frame = (frame_timestamp, encoded)
+    return encoded
+
+  def _capture(self, cap) -> None:
+    """Grab continuously so the driver buffer stays fresh; decode only frames the processor asks for."""
+    # Bound once: this loop runs at the driver's frame rate and mostly just grabs.
+    stopped, grab, frame_wanted = self._stop.is_set, cap.grab, self._frame_wanted.is_set
+    while not stopped():
+      if not grab():
+        logger.debug("Failed to grab frame; retrying soon.")
+        self._stop.wait(1.0)
+        continue
+      if not frame_wanted():
+        continue
+      frame_timestamp = utc_now_iso()
+      ret, frame = cap.retrieve()
+      if not ret:
+        continue
+      with self._raw_frame_lock:
+        self._latest_raw = (frame, frame_timestamp)
+        self._frame_wanted.clear()
+      self._raw_frame_ready.set()
+
+  def _take_raw_frame(self, timeout: float) -> Optional[Tuple[Any, str]]:
+    self._frame_wanted.set()
+    if not self._raw_frame_ready.wait(timeout):
+      return None
+    with self._raw_frame_lock:
+      latest, self._latest_raw = self._latest_raw, None
+      self._raw_frame_ready.clear()
+    return latest
+
+  def _apply_detections(self, event: Dict[str, Any], snapshot_bytes: Optional[bytes], detection: Future) -> None:
+    """Runs on the detector thread once a batch containing this frame finishes."""
+    detections = []
+    try:
+      detections = detection.result()
+    except Exception as exc:
+      logger.exception("Object detection failed; continuing without detections: %s", exc)
+    event["detections"] = detections
+    if detections:
+      labels = ", ".join(f"{det['label']} ({det['confidence'] * 100:.0f}%)" for det in detections)
+      event["message"] = f"{event['message']}: {labels}"
+    self._dispatch_event(event, snapshot_bytes)
+
+  def _dispatch_event(self, event: Dict[str, Any], snapshot_bytes: Optional[bytes]) -> None:
+    """Hand the event to the event loop without waiting for it to be persisted."""
+    if self._event_loop is None:
+      return
+    future = asyncio.run_coroutine_threadsafe(self.event_service.persist_event(event, snapshot_bytes), self._event_loop)
+    future.add_done_callback(_log_persist_failure)
 
   def _run(self) -> None:
     logger.info("Starting laptop camera monitor (enabled=%s)", self.settings.cam_monitor_enabled)
-    cap = cv2.VideoCapture(self.settings.camera_index)
+    cap = _open_capture(self.settings)
     if not cap.isOpened():
       logger.warning("Could not open webcam index %s; disable CAM_MONITOR_ENABLED to skip.", self.settings.camera_index)
       return
 
-    baseline = None
-    frames_without_motion = 0
+    capture_thread = threading.Thread(target=self._capture, args=(cap,), name="laptop-camera-capture", daemon=True)
+    capture_thread.start()
 
+    background = _create_background_model(self.settings)
+    motion_size: Optional[Tuple[int, int]] = None
+    min_area = 0.0
+
+    next_frame_at = time.monotonic()
     while not self._stop.is_set():
-      ret, frame = cap.read()
-      if not ret:
-        logger.debug("Failed to read frame; retrying soon.")
-        time.sleep(1.0)
+      # Pace against a deadline so waiting for and processing a frame count toward
+      # the interval, and wake immediately on stop instead of finishing a sleep.
+      delay = next_frame_at - time.monotonic()
+      if delay > 0 and self._stop.wait(delay):
+        break
+      latest = self._take_raw_frame(timeout=1.0)
+      if latest is None:
         continue
+      # Advance from the previous deadline so frame waits do not stretch the cadence;
+      # clamp to now so a stall is not followed by a burst of catch-up frames.
+      next_frame_at = max(next_frame_at + self.settings.cam_frame_interval, time.monotonic())
 
-      frame_timestamp = datetime.now(tz=timezone.utc).isoformat()
-      processed = _preprocess_frame(frame)
+      frame, frame_timestamp = latest
+      jpeg_bytes = None
+      if _is_encoded_jpeg(frame):
+        jpeg_bytes = frame.tobytes()
+        frame = cv2.imdecode(frame, cv2.IMREAD_COLOR)
+        if frame is None:
+          continue
+        latest = (frame, frame_timestamp)
+      seeding = motion_size is None
+      if seeding:
+        height, width = frame.shape[:2]
+        motion_size = _motion_size(frame)
+        min_area = self.settings.cam_min_area * (motion_size[0] * motion_size[1]) / (width * height)
+      processed = _preprocess_frame(frame, motion_size)
 
-      try:
-        success, buffer = cv2.imencode(".jpg", frame)
-        if success:
-          with self._latest_frame_lock:
-            self._latest_frame_bytes = buffer.tobytes()
-      except Exception as exc:
-        logger.debug("Failed to encode frame for snapshot: %s", exc)
+      # Publish the JPEG before the frame so a reader never pairs the new frame with a stale JPEG.
+      if jpeg_bytes is not None:
+        self._encoded_frame = (frame_timestamp, jpeg_bytes)
+      self._latest_frame = latest
 
-      if baseline is None:
-        baseline = processed
-        time.sleep(self.settings.cam_frame_interval)
+      if seeding:
+        # The first frame only seeds the background model.
+        background.apply(processed)
         continue
 
-      if _frame_has_motion(baseline, processed, self.settings.cam_motion_threshold, self.settings.cam_min_area):
-        baseline = processed
-        frames_without_motion = 0
-        base_message = "Laptop camera detected motion"
-        event = self.event_service.create_motion_event(source="laptop_cam", message=base_message)
+      if _frame_has_motion(background, processed, min_area):
+        # Only this thread replaces the latest frame, so this is the JPEG of `frame`.
+        encoded_bytes = self.latest_frame_bytes()
+        event = self.event_service.create_motion_event(source="laptop_cam", message="Laptop camera detected motion")
         event["frameTimestamp"] = frame_timestamp
 
-        snapshot_bytes = None
-        detections = []
         if self.detector:
-          try:
-            detections = self.detector.detect(frame)
-          except Exception as exc:
-            logger.exception("Object detection failed; continuing without detections: %s", exc)
-          event["detections"] = detections
-          if detections:
-            labels = ", ".join(f"{det['label']} ({det['confidence'] * 100:.0f}%)" for det in detections)
-            event["message"] = f"{base_message}: {labels}"
-
-        try:
-          success, buffer = cv2.imencode(".jpg", frame)
-          if success:
-            snapshot_bytes = buffer.tobytes()
-        except Exception as exc:
-          logger.debug("Failed to encode snapshot for event: %s", exc)
-
-        if self._event_loop is not None:
-          try:
-            future = asyncio.run_coroutine_threadsafe(self.event_service.persist_event(event, snapshot_bytes), self._event_loop)
-            future.result()
-          except Exception as exc:
-            logger.exception("Failed to record webcam motion event: %s", exc)
-      else:
-        frames_without_motion += 1
-        if frames_without_motion >= self.settings.cam_baseline_refresh_frames:
-          baseline = processed
-          frames_without_motion = 0
-
-      time.sleep(self.settings.cam_frame_interval)
+          detection = self.detector.submit(frame)
+          detection.add_done_callback(
+            lambda done, event=event, snapshot_bytes=encoded_bytes: self._apply_detections(event, snapshot_bytes, done)
+          )
+        else:
+          self._dispatch_event(event, encoded_bytes)
 
+    capture_thread.join(timeout=5)
     cap.release()
     logger.info("Laptop camera monitor stopped.")
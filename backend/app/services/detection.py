@@ -1,7 +1,11 @@
 """Thin wrapper around optional YOLO object detection."""
 
 import logging
-from typing import Any, Dict, List, Optional
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..settings import Settings
 
@@ -17,6 +21,10 @@ except ImportError:
 
 logger = logging.getLogger("home_ai_motion.detection")
 
+# Frames submitted within this window are run through the model as one batch.
+_BATCH_WAIT_SECONDS = 0.05
+_MAX_BATCH_SIZE = 8
+
 
 class ObjectDetector:
   """Wrap a YOLO model so we can flip between CPU/GPU via env."""
@@ -25,6 +33,30 @@ class ObjectDetector:
     self.settings = settings
     self.device = self._resolve_device()
     self.model = self._load_model()
+    self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue(maxsize=_MAX_BATCH_SIZE)
+    self._stop = threading.Event()
+    self._thread: Optional[threading.Thread] = None
+
+  def start(self) -> None:
+    if not self.model or self._thread:
+      return
+    self._stop.clear()
+    self._thread = threading.Thread(target=self._run, name="object-detector", daemon=True)
+    self._thread.start()
+
+  def stop(self) -> None:
+    self._stop.set()
+    if self._thread:
+      self._thread.join(timeout=5)
+    # Frames still queued will never reach the batching thread; resolve them empty
+    # so callers waiting on their futures don't hang.
+    while True:
+      try:
+        _, future = self._queue.get_nowait()
+      except queue.Empty:
+        break
+      if not future.done():
+        future.set_result([])
 
   def _resolve_device(self) -> str:
     if self.settings.ai_device_mode in ("gpu", "cuda"):
@@ -45,40 +77,83 @@ class ObjectDetector:
       logger.exception("Failed to load object detector: %s", exc)
       return None
 
+  def submit(self, frame) -> "Future[List[Dict[str, Any]]]":
+    """Queue a frame for batched detection; the future resolves to its detections."""
+    future: "Future[List[Dict[str, Any]]]" = Future()
+    if not self.model or self._stop.is_set():
+      future.set_result([])
+    elif self._thread is None:
+      try:
+        future.set_result(self.detect(frame))
+      except Exception as exc:
+        future.set_exception(exc)
+    else:
+      try:
+        self._queue.put_nowait((frame, future))
+      except queue.Full:
+        logger.debug("Detection queue is full; skipping detection for this frame.")
+        future.set_result([])
+    return future
+
+  def _run(self) -> None:
+    while not self._stop.is_set():
+      try:
+        batch = [self._queue.get(timeout=1)]
+      except queue.Empty:
+        continue
+      deadline = time.monotonic() + _BATCH_WAIT_SECONDS
+      while len(batch) < _MAX_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+          break
+        try:
+          batch.append(self._queue.get(timeout=remaining))
+        except queue.Empty:
+          break
+
+      try:
+        results = self.detect_batch([frame for frame, _ in batch])
+      except Exception as exc:
+        for _, future in batch:
+          future.set_exception(exc)
+        continue
+      for (_, future), detections in zip(batch, results):
+        future.set_result(detections)
+
   def detect(self, frame) -> List[Dict[str, Any]]:
     """Run detection on a BGR frame and return top predictions."""
+    return self.detect_batch([frame])[0]
+
+  def detect_batch(self, frames: List[Any]) -> List[List[Dict[str, Any]]]:
+    """Run the model once over several BGR frames; returns detections per frame."""
     if not self.model:
-      return []
+      return [[] for _ in frames]
 
-    height, width = frame.shape[:2]
     results = self.model(
-      frame,
+      frames,
       device=self.device,
       conf=self.settings.ai_confidence_threshold,
       verbose=False,
     )
-    detections: List[Dict[str, Any]] = []
-    for result in results:
-      names = result.names or {}
-      boxes = getattr(result, "boxes", None)
-      if boxes is None:
-        continue
+    return [self._parse_result(result) for result in results]
+
+  def _parse_result(self, result) -> List[Dict[str, Any]]:
+    boxes = getattr(result, "boxes", None)
+    if boxes is None or len(boxes) == 0:
+      return []
+
+    # Read whole tensors once; xyxyn is already normalized to the frame size on the model's device.
+    confidences = boxes.conf.cpu().numpy()
+    class_ids = boxes.cls.cpu().numpy().astype(int)
+    corners = boxes.xyxyn.cpu().numpy().clip(0.0, 1.0)
+    names = result.names or {}
 
-      for box in boxes:
-        cls_id = int(box.cls[0]) if getattr(box, "cls", None) is not None else -1
-        label = names.get(cls_id, f"class_{cls_id}")
-        conf_score = float(box.conf[0]) if getattr(box, "conf", None) is not None else 0.0
-        xyxy = box.xyxy[0].tolist() if getattr(box, "xyxy", None) is not None else None
-        bbox = None
-        if xyxy and len(xyxy) == 4 and width and height:
-          x1, y1, x2, y2 = xyxy
-          bbox = {
-            "x1": max(0.0, min(1.0, x1 / width)),
-            "y1": max(0.0, min(1.0, y1 / height)),
-            "x2": max(0.0, min(1.0, x2 / width)),
-            "y2": max(0.0, min(1.0, y2 / height)),
-          }
-        detections.append({"label": label, "confidence": conf_score, "bbox": bbox})
-
-    detections.sort(key=lambda det: det["confidence"], reverse=True)
-    return detections[: self.settings.ai_max_detections]
+    top = confidences.argsort()[::-1][: self.settings.ai_max_detections]
+    return [
+      {
+        "label": names.get(int(class_ids[i]), f"class_{class_ids[i]}"),
+        "confidence": float(confidences[i]),
+        "bbox": dict(zip(("x1", "y1", "x2", "y2"), map(float, corners[i]))),
+      }
+      for i in top
+    ]
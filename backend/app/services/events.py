@@ -1,11 +1,20 @@
 """Motion event helpers and persistence."""
 
-import json
+import asyncio
 import logging
 import os
+import queue
 import random
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import orjson
+from cachetools import TTLCache
 
 from ..db import Database, ensure_parent_dir
 from ..settings import Settings
@@ -14,6 +23,39 @@ from .notifications import NotificationWorker
 
 logger = logging.getLogger("home_ai_motion.events")
 
+# Newest rows are picked in the subquery and returned oldest-first, so no reverse() is needed.
+_SELECT_EVENTS_SQL = (
+  "SELECT * FROM ("
+  "SELECT id, timestamp, source, message, severity, zone, thumbnail_url, frame_timestamp, detections, snapshot_path "
+  "FROM motion_events ORDER BY id DESC LIMIT ?"
+  ") ORDER BY id ASC"
+)
+_INSERT_EVENT_SQL = (
+  "INSERT INTO motion_events (timestamp, source, message, severity, zone, thumbnail_url, frame_timestamp, detections) "
+  "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# Upper bound on inserts committed in one transaction, so one caller never holds
+# the write lock for an unbounded drain.
+_MAX_INSERT_BATCH = 64
+_SELECT_EXPIRED_SNAPSHOTS_SQL = "SELECT snapshot_path FROM motion_events WHERE timestamp < ? AND snapshot_path IS NOT NULL"
+_DELETE_EXPIRED_SQL = "DELETE FROM motion_events WHERE timestamp < ?"
+_UPDATE_SNAPSHOT_SQL = "UPDATE motion_events SET snapshot_path = ?, thumbnail_url = ? WHERE id = ?"
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") for the most recent utc_now_iso() call,
+# swapped as one tuple so concurrent callers never see a mismatched pair.
+_second_prefix: Tuple[int, str] = (-1, "")
+
+
+def utc_now_iso() -> str:
+  """Current UTC time in the datetime.isoformat() layout, reusing the formatted second."""
+  global _second_prefix
+  second, micros = divmod(time.time_ns() // 1000, 1_000_000)
+  cached_second, prefix = _second_prefix
+  if second != cached_second:
+    prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+    _second_prefix = (second, prefix)
+  return f"{prefix}.{micros:06d}+00:00"
+
 
 class EventService:
   """Create, persist, and broadcast motion events."""
@@ -29,86 +71,208 @@ class EventService:
     self.db = db
     self.ws_manager = ws_manager
     self.notifier = notifier
+    # Settings are fixed after startup, so freeze the choice pools once.
+    self._sources = tuple(settings.sources)
+    self._severity_levels = tuple(settings.severity_levels)
+    self._zones = tuple(settings.zones)
+    # Serialized /motion-events responses keyed by limit. Every write bumps
+    # _events_version, which invalidates them; the boot token keeps ETags
+    # from one process run from matching another.
+    self._events_version = 0
+    self._etag_prefix = secrets.token_hex(4)
+    self._events_cache: TTLCache = TTLCache(maxsize=4, ttl=5)
+    self._events_cache_lock = threading.Lock()
+    # The newest app_events_limit events, oldest first, so the common poll
+    # does not touch SQLite. Loaded from the database on first use.
+    self._recent_events: Optional[Deque[Dict[str, Any]]] = None
+    self._recent_events_lock = threading.Lock()
+    self._pending_inserts: "queue.SimpleQueue[Tuple[Dict[str, Any], Future]]" = queue.SimpleQueue()
 
   def create_motion_event(self, *, source: str | None = None, message: str = "Simulated motion detected") -> Dict[str, Any]:
     return {
-      "timestamp": datetime.now(tz=timezone.utc).isoformat(),
-      "source": source or random.choice(self.settings.sources),
+      "timestamp": utc_now_iso(),
+      "source": source or random.choice(self._sources),
       "message": message,
-      "severity": random.choice(self.settings.severity_levels),
-      "zone": random.choice(self.settings.zones),
+      "severity": random.choice(self._severity_levels),
+      "zone": random.choice(self._zones),
       "thumbnailUrl": self.settings.thumbnail_placeholder,
     }
 
   def fetch_motion_events(self, limit: int | None = None) -> List[Dict[str, Any]]:
     limit = limit or self.settings.app_events_limit
+    if limit > self.settings.app_events_limit:
+      return self._query_motion_events(limit)
+    # Read the window once: a prune may reset the attribute to None at any point.
+    window = self._recent_events
+    if window is None:
+      window = self._load_recent_events()
+    with self._recent_events_lock:
+      events = list(window)
+    return events[-limit:]
+
+  def _load_recent_events(self) -> Deque[Dict[str, Any]]:
+    # Held against the writer so no insert lands between the query and the swap.
+    with self.db.write_lock():
+      window = self._recent_events
+      if window is None:
+        events = self._query_motion_events(self.settings.app_events_limit)
+        window = deque(events, maxlen=self.settings.app_events_limit)
+        with self._recent_events_lock:
+          self._recent_events = window
+    return window
+
+  def _remember_event(self, event: Dict[str, Any]) -> None:
+    """Append a freshly inserted event to the in-memory window. Call under the write lock."""
+    window = self._recent_events
+    if window is None:
+      return
+    with self._recent_events_lock:
+      window.append(event)
+
+  def _query_motion_events(self, limit: int) -> List[Dict[str, Any]]:
     with self.db.connect() as conn:
-      cursor = conn.execute(
-        "SELECT id, timestamp, source, message, severity, zone, thumbnail_url, frame_timestamp, detections, snapshot_path FROM motion_events ORDER BY id DESC LIMIT ?",
-        (limit,),
-      )
+      cursor = conn.execute(_SELECT_EVENTS_SQL, (limit,))
       rows = cursor.fetchall()
 
-    events = [
+    return [
       {
-        "id": row["id"],
-        "timestamp": row["timestamp"],
-        "source": row["source"],
-        "message": row["message"],
-        "severity": row["severity"],
-        "zone": row["zone"],
-        "thumbnailUrl": row["thumbnail_url"] or (f"/api/event-snapshot/{row['id']}" if row["snapshot_path"] else None),
-        "frameTimestamp": row["frame_timestamp"],
-        "detections": json.loads(row["detections"]) if row["detections"] else [],
+        "id": event_id,
+        "timestamp": timestamp,
+        "source": source,
+        "message": message,
+        "severity": severity,
+        "zone": zone,
+        "thumbnailUrl": thumbnail_url or (f"/api/event-snapshot/{event_id}" if snapshot_path else None),
+        "frameTimestamp": frame_timestamp,
+        "detections": orjson.loads(detections) if detections else [],
       }
-      for row in rows
+      for event_id, timestamp, source, message, severity, zone, thumbnail_url, frame_timestamp, detections, snapshot_path in rows
     ]
-    events.reverse()
-    return events
 
-  async def persist_event(self, event: Dict[str, Any], snapshot_bytes: bytes | None = None) -> Dict[str, Any]:
+  def motion_events_response(self, limit: int | None = None) -> Tuple[str, bytes]:
+    """Return (etag, JSON body) for the latest events, reusing the cached body until the next write."""
+    limit = limit or self.settings.app_events_limit
+    version = self._events_version
+    with self._events_cache_lock:
+      cached = self._events_cache.get(limit)
+    if cached and cached[0] == version:
+      return cached[1], cached[2]
+
+    etag = f'W/"{self._etag_prefix}-{version}-{limit}"'
+    body = orjson.dumps({"events": self.fetch_motion_events(limit)})
+    with self._events_cache_lock:
+      self._events_cache[limit] = (version, etag, body)
+    return etag, body
+
+  def store_event(self, event: Dict[str, Any], snapshot_bytes: bytes | None = None) -> Dict[str, Any]:
+    """Write an event (and optional snapshot) to SQLite. Blocking; call from a worker thread.
+
+    Inserts are queued and whichever caller gets the write lock first commits
+    everything waiting, so a burst of events shares one transaction. A failed
+    batch is raised only to the callers whose events were in it.
+    """
+    # Fill optional keys on every insert so the simulate response, WebSocket
+    # payload, and /motion-events rows all have the same shape.
+    event.setdefault("frameTimestamp", None)
     if "detections" not in event:
       event["detections"] = []
-    snapshot_path: Optional[str] = None
+
+    inserted: Future = Future()
+    self._pending_inserts.put((event, inserted))
+    with self.db.write_lock():
+      while not inserted.done():
+        self._insert_pending()
+    inserted.result()
+
+    if snapshot_bytes:
+      self._save_snapshot(event, snapshot_bytes)
+    return event
+
+  def _insert_pending(self) -> None:
+    """Insert queued events in a single transaction. Call under the write lock."""
+    batch = []
+    while len(batch) < _MAX_INSERT_BATCH:
+      try:
+        batch.append(self._pending_inserts.get_nowait())
+      except queue.Empty:
+        break
+
+    row_ids = []
+    with self.db.connect() as conn:
+      try:
+        for event, _ in batch:
+          cursor = conn.execute(
+            _INSERT_EVENT_SQL,
+            (
+              event["timestamp"],
+              event["source"],
+              event["message"],
+              event.get("severity"),
+              event.get("zone"),
+              event.get("thumbnailUrl"),
+              event.get("frameTimestamp"),
+              orjson.dumps(event.get("detections") or []).decode(),
+            ),
+          )
+          row_ids.append(cursor.lastrowid)
+        conn.commit()
+      except BaseException as exc:
+        if conn.in_transaction:
+          conn.rollback()
+        # Fail only the callers whose rows were in this batch; whoever is draining
+        # learns about its own row through its future like everyone else.
+        for _, inserted in batch:
+          inserted.set_exception(exc)
+        if not isinstance(exc, Exception):
+          raise
+        return
+
+    for (event, inserted), row_id in zip(batch, row_ids):
+      event["id"] = row_id
+      self._remember_event(event)
+      inserted.set_result(None)
+    self._events_version += 1
+
+  def _save_snapshot(self, event: Dict[str, Any], snapshot_bytes: bytes) -> None:
+    """Write the JPEG outside the write lock, then point the row at it."""
+    snapshot_path = os.path.join(self.settings.snapshot_dir, f"event-{event['id']}.jpg")
+    thumbnail_url = f"/api/event-snapshot/{event['id']}"
+    try:
+      ensure_parent_dir(snapshot_path)
+      partial_path = f"{snapshot_path}.part"
+      with open(partial_path, "wb") as f:
+        f.write(snapshot_bytes)
+      os.replace(partial_path, snapshot_path)
+    except Exception as exc:
+      logger.exception("Failed to save snapshot for event %s: %s", event["id"], exc)
+      return
 
     with self.db.write_lock():
       with self.db.connect() as conn:
-        cursor = conn.execute(
-          """
-          INSERT INTO motion_events (timestamp, source, message, severity, zone, thumbnail_url, frame_timestamp, detections, snapshot_path)
-          VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-          """,
-          (
-            event["timestamp"],
-            event["source"],
-            event["message"],
-            event.get("severity"),
-            event.get("zone"),
-            event.get("thumbnailUrl"),
-            event.get("frameTimestamp"),
-            json.dumps(event.get("detections") or []),
-            snapshot_path,
-          ),
-        )
+        conn.execute(_UPDATE_SNAPSHOT_SQL, (snapshot_path, thumbnail_url, event["id"]))
         conn.commit()
-        event["id"] = cursor.lastrowid
-
-        if snapshot_bytes:
-          ensure_parent_dir(self.settings.snapshot_dir)
-          snapshot_path = os.path.join(self.settings.snapshot_dir, f"event-{event['id']}.jpg")
-          try:
-            with open(snapshot_path, "wb") as f:
-              f.write(snapshot_bytes)
-            conn.execute("UPDATE motion_events SET snapshot_path = ?, thumbnail_url = ? WHERE id = ?", (snapshot_path, f"/api/event-snapshot/{event['id']}", event["id"]))
-            conn.commit()
-            event["thumbnailUrl"] = f"/api/event-snapshot/{event['id']}"
-          except Exception as exc:
-            logger.exception("Failed to save snapshot for event %s: %s", event["id"], exc)
-
-    await self.ws_manager.broadcast({"type": "motion_event", "payload": event})
+        event["thumbnailUrl"] = thumbnail_url
+        # The window may have been reloaded from SQLite since the insert, in which
+        # case it holds a separate dict for this row; update it by id.
+        window = self._recent_events
+        if window is not None:
+          with self._recent_events_lock:
+            for entry in reversed(window):
+              if entry["id"] == event["id"]:
+                entry["thumbnailUrl"] = thumbnail_url
+                break
+        self._events_version += 1
+
+  async def publish_event(self, event: Dict[str, Any]) -> None:
+    """Push a stored event to WebSocket clients and the webhook notifier."""
+    await self.ws_manager.broadcast_event(event)
 
     if self.notifier and str(event.get("severity", "")).lower() == "high":
       self.notifier.enqueue(event)
+
+  async def persist_event(self, event: Dict[str, Any], snapshot_bytes: bytes | None = None) -> Dict[str, Any]:
+    await asyncio.to_thread(self.store_event, event, snapshot_bytes)
+    await self.publish_event(event)
     return event
 
   def get_snapshot_path(self, event_id: int) -> Optional[str]:
@@ -127,17 +291,21 @@ class EventService:
     cutoff_iso = cutoff.isoformat()
     with self.db.write_lock():
       with self.db.connect() as conn:
-        cursor = conn.execute("SELECT id, snapshot_path FROM motion_events WHERE timestamp < ?", (cutoff_iso,))
-        rows = cursor.fetchall()
-        ids = [row["id"] for row in rows]
-        snapshots = [row["snapshot_path"] for row in rows if row["snapshot_path"]]
-        for path in snapshots:
-          try:
-            if os.path.exists(path):
-              os.remove(path)
-          except Exception:
-            logger.debug("Failed to remove snapshot %s", path)
-        if ids:
-          conn.executemany("DELETE FROM motion_events WHERE id = ?", [(id_,) for id_ in ids])
-          conn.commit()
-    return len(ids)
+        cursor = conn.execute(_SELECT_EXPIRED_SNAPSHOTS_SQL, (cutoff_iso,))
+        snapshots = [row["snapshot_path"] for row in cursor.fetchall()]
+        pruned = conn.execute(_DELETE_EXPIRED_SQL, (cutoff_iso,)).rowcount
+        conn.commit()
+        if pruned:
+          # Reload the window lazily rather than working out which entries expired.
+          self._recent_events = None
+          self._events_version += 1
+
+    # Files are removed after the lock is released so inserts are not held up by disk I/O.
+    for path in snapshots:
+      try:
+        os.remove(path)
+      except FileNotFoundError:
+        pass
+      except Exception:
+        logger.debug("Failed to remove snapshot %s", path)
+    return pruned
@@ -6,6 +6,7 @@ import threading
 from typing import Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger("home_ai_motion.notifications")
 
@@ -18,6 +19,11 @@ class NotificationWorker:
     self._stop = threading.Event()
     self._queue: "queue.Queue[Dict]" = queue.Queue()
     self._thread: Optional[threading.Thread] = None
+    # One pooled keep-alive session avoids a fresh TCP/TLS handshake per event.
+    self._session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+    self._session.mount("https://", adapter)
+    self._session.mount("http://", adapter)
 
   def start(self) -> None:
     if not self.webhook_url or self._thread:
@@ -29,6 +35,7 @@ class NotificationWorker:
     self._stop.set()
     if self._thread:
       self._thread.join(timeout=5)
+    self._session.close()
 
   def enqueue(self, event: Dict) -> None:
     if not self.webhook_url:
@@ -45,7 +52,7 @@ class NotificationWorker:
       except queue.Empty:
         continue
       try:
-        requests.post(
+        self._session.post(
           self.webhook_url,
           json={"type": "motion_event", "payload": event},
           timeout=5,
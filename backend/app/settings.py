@@ -26,6 +26,7 @@ class Settings(BaseSettings):
 
   app_host: str = Field("0.0.0.0", env="APP_HOST")
   app_port: int = Field(8000, env="APP_PORT")
+  app_reload: bool = Field(True, env="APP_RELOAD")
   app_db_path: str = Field("data/motion.db", env="APP_DB_PATH")
   app_password_salt: str = Field("home-ai-dashboard", env="APP_PASSWORD_SALT")
   app_auth_username: str = Field("admin", env="APP_AUTH_USERNAME")
@@ -51,6 +52,7 @@ class Settings(BaseSettings):
   cam_motion_threshold: float = Field(25.0, env="CAM_MOTION_THRESHOLD")
   cam_min_area: int = Field(5000, env="CAM_MIN_AREA")
   cam_baseline_refresh_frames: int = Field(150, env="CAM_BASELINE_REFRESH_FRAMES")
+  cam_jpeg_quality: int = Field(80, env="CAM_JPEG_QUALITY")
 
   notify_webhook_url: str = Field("", env="APP_NOTIFY_WEBHOOK_URL")
 
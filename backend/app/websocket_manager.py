@@ -1,37 +1,93 @@
 """WebSocket connection tracking and broadcasting."""
 
-from typing import Any, Dict, List
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+import orjson
 from fastapi import WebSocket
-from fastapi.encoders import jsonable_encoder
+
+logger = logging.getLogger("home_ai_motion.websocket")
+
+# Messages buffered per client before it is considered too slow and dropped.
+_SEND_QUEUE_SIZE = 32
+# A single send that takes longer than this marks the client as stalled.
+_SEND_TIMEOUT_SECONDS = 5.0
+# Motion events published within this window are sent to clients as one frame.
+_EVENT_BATCH_WINDOW_SECONDS = 0.02
 
 
 class ConnectionManager:
-  """Track active WebSocket connections and broadcast events."""
+  """Track active WebSocket connections and broadcast events.
+
+  Each connection gets its own bounded queue drained by a sender task, so a
+  slow client only backs up its own queue instead of stalling broadcasts.
+  """
 
   def __init__(self) -> None:
-    self.active_connections: List[WebSocket] = []
+    self.active_connections: Dict[WebSocket, "asyncio.Queue[str]"] = {}
+    # Copy-on-write snapshot of active_connections, rebuilt on connect/disconnect
+    # so each broadcast iterates it without allocating.
+    self._targets: Tuple[Tuple[WebSocket, "asyncio.Queue[str]"], ...] = ()
+    self._senders: Dict[WebSocket, asyncio.Task] = {}
+    self._closing: Set[asyncio.Task] = set()
+    self._pending_events: List[Dict[str, Any]] = []
+    self._flush_handle: Optional[asyncio.TimerHandle] = None
 
-  async def connect(self, websocket: WebSocket) -> None:
-    await websocket.accept()
-    self.active_connections.append(websocket)
+  async def connect(self, websocket: WebSocket, subprotocol: Optional[str] = None) -> None:
+    await websocket.accept(subprotocol=subprotocol)
+    queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=_SEND_QUEUE_SIZE)
+    self.active_connections[websocket] = queue
+    self._targets = tuple(self.active_connections.items())
+    self._senders[websocket] = asyncio.create_task(self._sender(websocket, queue))
 
   def disconnect(self, websocket: WebSocket) -> None:
-    if websocket in self.active_connections:
-      self.active_connections.remove(websocket)
+    if self.active_connections.pop(websocket, None) is not None:
+      self._targets = tuple(self.active_connections.items())
+    sender = self._senders.pop(websocket, None)
+    if sender and sender is not asyncio.current_task():
+      sender.cancel()
 
-  async def broadcast(self, message: Dict[str, Any]) -> None:
+  async def _sender(self, websocket: WebSocket, queue: "asyncio.Queue[str]") -> None:
+    while True:
+      data = await queue.get()
+      try:
+        await asyncio.wait_for(websocket.send_text(data), timeout=_SEND_TIMEOUT_SECONDS)
+      except Exception:
+        self.disconnect(websocket)
+        await self._close(websocket)
+        return
+
+  async def _close(self, websocket: WebSocket) -> None:
+    try:
+      await websocket.close()
+    except Exception:
+      logger.debug("Failed to close dropped WebSocket client.")
+
+  async def broadcast_event(self, event: Dict[str, Any]) -> None:
+    """Queue a motion event; events arriving within the batch window share one frame."""
     if not self.active_connections:
       return
+    self._pending_events.append(event)
+    if self._flush_handle is None:
+      self._flush_handle = asyncio.get_running_loop().call_later(_EVENT_BATCH_WINDOW_SECONDS, self._flush_events)
 
-    payload = jsonable_encoder(message)
-    disconnected: List[WebSocket] = []
+  def _flush_events(self) -> None:
+    self._flush_handle = None
+    events, self._pending_events = self._pending_events, []
+    if len(events) == 1:
+      message = {"type": "motion_event", "payload": events[0]}
+    else:
+      message = {"type": "motion_events_batch", "payload": events}
+    self._enqueue(orjson.dumps(message).decode())
 
-    for connection in list(self.active_connections):
+  def _enqueue(self, data: str) -> None:
+    for connection, queue in self._targets:
       try:
-        await connection.send_json(payload)
-      except Exception:
-        disconnected.append(connection)
-
-    for connection in disconnected:
-      self.disconnect(connection)
+        queue.put_nowait(data)
+      except asyncio.QueueFull:
+        logger.warning("Dropping slow WebSocket client; its send queue is full.")
+        self.disconnect(connection)
+        task = asyncio.create_task(self._close(connection))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
@@ -22,39 +22,59 @@ logger = logging.getLogger("home_ai_motion")
 logging.basicConfig(level=logging.INFO)
 
 settings = get_settings()
-db = Database(settings)
-ws_manager = ConnectionManager()
-notifier = NotificationWorker(settings.notify_webhook_url) if settings.notify_webhook_url else None
-detector = ObjectDetector(settings) if settings.ai_detection_enabled else None
-event_service = EventService(settings, db, ws_manager, notifier)
-camera_monitor = CameraMonitor(settings, event_service, detector) if settings.cam_monitor_enabled else None
-retention_pruner = (
-  RetentionPruner(event_service, settings.retention_prune_interval_seconds) if settings.retention_days > 0 else None
-)
+
+# Seconds uvicorn waits for open responses on shutdown or reload before cancelling them.
+_GRACEFUL_SHUTDOWN_SECONDS = 3
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-  """Initialize resources on startup and clean them up on shutdown."""
-  default_hash = hash_password(settings.app_auth_password, settings)
-  db.init_db(default_username=settings.app_auth_username, default_password_hash=default_hash)
+  """Build shared services on startup, store them on app.state, and tear them down on shutdown."""
+  db = Database(settings)
+  # scrypt is deliberately slow, so the default password is only hashed when the user is first seeded.
+  db.init_db(
+    default_username=settings.app_auth_username,
+    hash_default_password=lambda: hash_password(settings.app_auth_password),
+  )
+
+  ws_manager = ConnectionManager()
+  notifier = NotificationWorker(settings.notify_webhook_url) if settings.notify_webhook_url else None
+  detector = ObjectDetector(settings) if settings.ai_detection_enabled else None
+  event_service = EventService(settings, db, ws_manager, notifier)
+  camera_monitor = CameraMonitor(settings, event_service, detector) if settings.cam_monitor_enabled else None
+  retention_pruner = (
+    RetentionPruner(event_service, settings.retention_prune_interval_seconds) if settings.retention_days > 0 else None
+  )
+
+  # Store shared services on app.state so dependencies can access them.
+  app.state.db = db
+  app.state.ws_manager = ws_manager
+  app.state.event_service = event_service
+  app.state.camera_monitor = camera_monitor
+  app.state.detector = detector
+  app.state.notifier = notifier
+  app.state.retention_pruner = retention_pruner
 
   if notifier:
     notifier.start()
   if retention_pruner:
     retention_pruner.start()
-  if camera_monitor and settings.cam_monitor_enabled:
-    loop = asyncio.get_running_loop()
-    camera_monitor.start(loop)
+  if detector:
+    detector.start()
+  if camera_monitor:
+    camera_monitor.start(asyncio.get_running_loop())
 
   yield
 
   if camera_monitor:
     camera_monitor.stop()
+  if detector:
+    detector.stop()
   if retention_pruner:
     retention_pruner.stop()
   if notifier:
     notifier.stop()
+  db.close()
 
 
 app = FastAPI(title="Home AI Motion Dashboard", lifespan=lifespan)
@@ -66,15 +86,8 @@ app.add_middleware(
   allow_headers=["*"],
 )
 
-# Store shared services on app.state so dependencies can access them.
+# Services are attached in lifespan; settings are needed up front for CORS.
 app.state.settings = settings
-app.state.db = db
-app.state.ws_manager = ws_manager
-app.state.event_service = event_service
-app.state.camera_monitor = camera_monitor
-app.state.detector = detector
-app.state.notifier = notifier
-app.state.retention_pruner = retention_pruner
 
 app.include_router(api_router)
 
@@ -82,4 +95,13 @@ app.include_router(api_router)
 if __name__ == "__main__":
   import uvicorn
 
-  uvicorn.run("main:app", host=settings.app_host, port=settings.app_port, reload=True)
+  # uvicorn[standard] ships uvloop and httptools, which the default loop/http="auto" already pick.
+  # Stay on one worker: the webcam, WebSocket clients, and event caches all live in this process.
+  # Long-lived responses such as /api/stream.mjpg never finish on their own.
+  uvicorn.run(
+    "main:app",
+    host=settings.app_host,
+    port=settings.app_port,
+    reload=settings.app_reload,
+    timeout_graceful_shutdown=_GRACEFUL_SHUTDOWN_SECONDS,
+  )
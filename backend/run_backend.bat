@@ -18,4 +18,4 @@ if exist .env (
 if "%APP_HOST%"=="" set APP_HOST=0.0.0.0
 if "%APP_PORT%"=="" set APP_PORT=8000
 
-uvicorn main:app --host %APP_HOST% --port %APP_PORT% --reload
+uvicorn main:app --host %APP_HOST% --port %APP_PORT% --reload --timeout-graceful-shutdown 3
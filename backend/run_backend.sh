@@ -17,4 +17,4 @@ fi
 HOST="${APP_HOST:-0.0.0.0}"
 PORT="${APP_PORT:-8000}"
 
-uvicorn main:app --host "${HOST}" --port "${PORT}" --reload
+uvicorn main:app --host "${HOST}" --port "${PORT}" --reload --timeout-graceful-shutdown 3
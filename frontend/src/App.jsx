@@ -356,20 +356,28 @@ function App() {
       }
     })()
 
-    const socket = new WebSocket(`${wsUrl}?token=${encodeURIComponent(token)}`)
+    // Send the token as a subprotocol so it stays out of URLs and access logs.
+    const socket = new WebSocket(wsUrl, ['bearer', token])
 
     socket.onmessage = (event) => {
       try {
         const payload = JSON.parse(event.data)
+        let incoming = []
         if (payload?.type === 'motion_event' && payload.payload) {
+          incoming = [payload.payload]
+        } else if (payload?.type === 'motion_events_batch' && Array.isArray(payload.payload)) {
+          // Bursts of events are coalesced server-side into a single frame.
+          incoming = payload.payload
+        }
+        if (incoming.length > 0) {
           if (livePaused) {
-            setQueuedEvents((prev) => mergeEvents(prev, [payload.payload]))
+            setQueuedEvents((prev) => mergeEvents(prev, incoming))
           } else {
-            setEvents((prev) => mergeEvents(prev, [payload.payload]))
-            const key = getEventKey(payload.payload)
-            setHighlightedIds((prev) => (prev.includes(key) ? prev : [...prev, key]))
+            setEvents((prev) => mergeEvents(prev, incoming))
+            const keys = incoming.map(getEventKey)
+            setHighlightedIds((prev) => [...prev, ...keys.filter((key) => !prev.includes(key))])
             setTimeout(() => {
-              setHighlightedIds((prev) => prev.filter((id) => id !== key))
+              setHighlightedIds((prev) => prev.filter((id) => !keys.includes(id)))
             }, 2500)
           }
         }